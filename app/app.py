@@ -3,25 +3,67 @@ import sqlite3
 import os
 import datetime
 import json
+import re
+import base64
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+import math
 import pandas as pd
 import plotly.express as px
-from astropy.coordinates import SkyCoord
-import astropy.units as u
+from PIL import Image, ImageOps
 from lang import translations
 
+# orjson is optional; it parses the celestial catalog several times faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # --- Project and Data Configuration ---
 PROJECT_NAME = "Astro Notebook 2025"
 DB_NAME = "observations.db"
 UPLOAD_FOLDER = "uploads"
+THUMBNAIL_FOLDER = os.path.join(UPLOAD_FOLDER, "thumbs")
+THUMBNAIL_SIZE = (256, 256)
 CELESTIAL_DATA_FILE = "data/celestial_data.json"
+# Shorter queries only match whole ids/names; a single letter would prefix-match almost anything
+MIN_PREFIX_LENGTH = 2
+
+# --- SQL statements (kept verbatim so sqlite3's statement cache reuses them) ---
+SQL_INSERT_OBSERVATION = (
+    "INSERT INTO observations (celestial_id, celestial_name_en, celestial_name_kr, catalog, ra, dec, magnitude, type, "
+    "constellation, notes, image_path, observation_date, ra_deg, dec_deg) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+SQL_UPDATE_OBSERVATION = "UPDATE observations SET notes=?, image_path=? WHERE id=?"
+SQL_SELECT_IMAGE_PATH = "SELECT image_path FROM observations WHERE id=?"
+SQL_DELETE_OBSERVATION = "DELETE FROM observations WHERE id=?"
+SQL_DELETE_OBSERVATION_RETURNING = "DELETE FROM observations WHERE id=? RETURNING image_path"
+# RETURNING needs SQLite 3.35+; older builds look the image path up first
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+SQL_UPDATE_DEGREES = "UPDATE observations SET ra_deg=?, dec_deg=? WHERE id=?"
+
+# Columns read by the observation log, in the order its rows are unpacked
+LIST_COLS = [
+    'id', 'celestial_id', 'celestial_name_en', 'celestial_name_kr', 'catalog', 'ra', 'dec',
+    'magnitude', 'type', 'constellation', 'notes', 'image_path', 'observation_date'
+]
+# Columns used by the star map, and the DataFrame column each one becomes
+VIZ_COLS = {'celestial_name_en': 'name', 'notes': 'notes', 'ra_deg': 'ra', 'dec_deg': 'dec'}
+
+st.set_page_config(page_title=PROJECT_NAME, layout="wide")
 
 # Initialize session state variables
 if 'editing' not in st.session_state:
     st.session_state.editing = None
 if 'found_object' not in st.session_state:
     st.session_state.found_object = None
-if 'current_page' not in st.session_state:
-    st.session_state.current_page = 0
+if 'last_query' not in st.session_state:
+    st.session_state.last_query = None
+    st.session_state.last_result = None
+if 'cursor_stack' not in st.session_state:
+    st.session_state.cursor_stack = []
 if 'selected_date' not in st.session_state:
     st.session_state.selected_date = None
 if 'language' not in st.session_state:
@@ -30,23 +72,243 @@ if 'language' not in st.session_state:
 # Get the translation dictionary for the selected language
 lang = translations[st.session_state.language]
 
-# Check and create the uploads folder
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+# Check and create the uploads (and thumbnails) folder
+if not os.path.exists(THUMBNAIL_FOLDER):
+    os.makedirs(THUMBNAIL_FOLDER)
+
+def normalize_term(term):
+    """Normalizes a search term: lowercase with all spaces removed."""
+    return (term or '').lower().replace(" ", "")
+
+@st.cache_resource
+def load_celestial(path):
+    """Loads the celestial data and builds its search index once per process.
+
+    Cached as a resource so reruns share the parsed objects instead of
+    unpickling a fresh copy each time; callers must treat them as read-only.
+
+    Returns the object list and a trie over every normalized id/name/alias.
+    Each trie node is a ``[best_index, children, exact_index]`` list:
+    ``children`` maps ``ord(char)`` to the child node, ``best_index`` is the
+    first object (in catalog order) among all keys below the node, and
+    ``exact_index`` is the first object whose key ends at the node, or None.
+    """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+    exact_index = {}
+    for idx, obj in enumerate(data):
+        terms = [obj.get('id'), obj.get('name_en'), obj.get('name_kr')]
+        terms += obj.get('aliases_en') or []
+        terms += obj.get('aliases_kr') or []
+        for term in terms:
+            key = normalize_term(term)
+            if key:
+                exact_index.setdefault(key, idx)
+    trie = [len(data), {}, None]
+    for key, idx in exact_index.items():
+        node = trie
+        for ch in key:
+            node = node[1].setdefault(ord(ch), [idx, {}, None])
+            if idx < node[0]:
+                node[0] = idx
+        node[2] = idx
+    return data, trie
+
+def search_celestial(query):
+    """Finds a celestial object by exact match first, then by "starts with" match.
+
+    Ties are resolved in catalog order (brightest first), as before.
+    """
+    if not query:
+        return None
+    # One walk along the query answers both: the node reached knows its exact
+    # match and the best match among the keys it prefixes
+    node = CELESTIAL_TRIE
+    for ch in query:
+        node = node[1].get(ord(ch))
+        if node is None:
+            return None
+    if node[2] is not None:
+        return CELESTIAL_DATA[node[2]]
+    if len(query) < MIN_PREFIX_LENGTH:
+        return None
+    return CELESTIAL_DATA[node[0]]
+
+@st.cache_resource
+def get_search_conn(path):
+    """Builds an in-memory FTS5 index over the celestial ids, names and aliases.
+
+    Returns None when the SQLite build lacks FTS5; search then skips the word match.
+    """
+    data = load_celestial(path)[0]
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE celestial_fts USING fts5("
+            "id, name_en, name_kr, aliases, tokenize='unicode61 remove_diacritics 2')"
+        )
+    except sqlite3.OperationalError:
+        return None
+    conn.executemany(
+        "INSERT INTO celestial_fts (rowid, id, name_en, name_kr, aliases) VALUES (?, ?, ?, ?, ?)",
+        [
+            (idx, obj.get('id'), obj.get('name_en'), obj.get('name_kr'),
+             " ".join(filter(None, (obj.get('aliases_en') or []) + (obj.get('aliases_kr') or []))))
+            for idx, obj in enumerate(data)
+        ]
+    )
+    return conn
+
+def search_celestial_words(text):
+    """Finds the first celestial object with a word starting with each word of the text.
+
+    Catches queries that match inside a name, e.g. "nebula" for "Orion Nebula".
+    """
+    conn = get_search_conn(CELESTIAL_DATA_FILE)
+    words = re.findall(r"\w+", text)
+    if conn is None or not words or len("".join(words)) < MIN_PREFIX_LENGTH:
+        return None
+    match = " ".join('"' + word + '"*' for word in words)
+    row = conn.execute(
+        "SELECT rowid FROM celestial_fts WHERE celestial_fts MATCH ? ORDER BY rowid LIMIT 1", (match,)
+    ).fetchone()
+    return CELESTIAL_DATA[row[0]] if row else None
 
 # Load celestial data from JSON
 try:
-    with open(CELESTIAL_DATA_FILE, 'r', encoding='utf-8') as f:
-        CELESTIAL_DATA = json.load(f)
+    CELESTIAL_DATA, CELESTIAL_TRIE = load_celestial(CELESTIAL_DATA_FILE)
 except FileNotFoundError:
     st.error(f"Error: The '{CELESTIAL_DATA_FILE}' file was not found. Please create it with the provided JSON data.")
     st.stop()
 
+@st.cache_resource
+def get_conn():
+    """Opens the SQLite connection shared by every rerun and session.
+
+    The connection runs in autocommit mode with WAL journaling, so readers never
+    block on a writer and each commit costs a single WAL append.
+    """
+    conn = sqlite3.connect(DB_NAME, check_same_thread=False, isolation_level=None)
+    conn.executescript(
+        "PRAGMA journal_mode=WAL;"
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA cache_size=-64000;"
+        "PRAGMA busy_timeout=5000;"
+    )
+    return conn
+
+@st.cache_resource
+def get_write_lock():
+    """Returns the lock that serializes writes on the shared connection."""
+    return threading.Lock()
+
+@contextmanager
+def write_transaction():
+    """Runs a block of writes as a single IMMEDIATE transaction on the shared connection.
+
+    Yields the connection; commits when the block finishes and rolls back if it raises.
+    """
+    conn = get_conn()
+    with get_write_lock():
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+@st.cache_resource(max_entries=1)
+def read_db_bytes(version):
+    """Reads the database file for download, once per database version.
+
+    Kept as a shared resource rather than cached data: the bytes are immutable,
+    so every session can reuse the same buffer without a per-rerun copy.
+    """
+    # Fold the WAL back into the main file so the export holds every committed row.
+    # Hold the write lock throughout: no transaction may be open on the shared
+    # connection during the checkpoint, and no commit (or its auto-checkpoint)
+    # may rewrite pages of the main file while it is being copied.
+    with get_write_lock():
+        get_conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        with open(DB_NAME, "rb") as f:
+            return f.read()
+
+# Catalog-style sexagesimal coordinates ("HH:MM:SS.ss", "+DD:MM:SS.ss")
+RA_SEXAGESIMAL_RE = re.compile(r"\d{1,2}:\d{1,2}:\d{1,2}(?:\.\d+)?")
+DEC_SEXAGESIMAL_RE = re.compile(r"[+-]?\d{1,2}:\d{1,2}:\d{1,2}(?:\.\d+)?")
+
+def parse_ra_dec(ra_values, dec_values):
+    """Converts RA/Dec strings to degrees, returning NaN for values that fail to parse.
+
+    Pairs in the catalog's sexagesimal format are converted with a single
+    vectorized SkyCoord call; anything else (other notations, blanks, garbage)
+    is tried row by row, so one bad value no longer sends the whole batch down
+    the slow path.
+    """
+    # astropy is slow to import and only needed when coordinates are parsed
+    # (saving an observation or backfilling an old database), so load it lazily
+    from astropy.coordinates import SkyCoord
+    import astropy.units as u
+
+    ra_deg = [float('nan')] * len(ra_values)
+    dec_deg = [float('nan')] * len(dec_values)
+    batch, others = [], []
+    for i, (ra_str, dec_str) in enumerate(zip(ra_values, dec_values)):
+        if not ra_str or not dec_str:
+            continue
+        if RA_SEXAGESIMAL_RE.fullmatch(ra_str) and DEC_SEXAGESIMAL_RE.fullmatch(dec_str):
+            batch.append(i)
+        else:
+            others.append(i)
+
+    if batch:
+        try:
+            coords = SkyCoord(
+                ra=[ra_values[i] for i in batch], dec=[dec_values[i] for i in batch],
+                unit=(u.hourangle, u.deg)
+            )
+            for i, ra, dec in zip(batch, coords.ra.deg, coords.dec.deg):
+                ra_deg[i], dec_deg[i] = ra, dec
+        except Exception:
+            # Well-formed but out of range (e.g. 75 minutes): find the culprit row by row
+            others.extend(batch)
+
+    for i in others:
+        try:
+            coord = SkyCoord(ra=ra_values[i], dec=dec_values[i], unit=(u.hourangle, u.deg))
+            ra_deg[i], dec_deg[i] = coord.ra.deg, coord.dec.deg
+        except Exception:
+            pass
+    return ra_deg, dec_deg
+
+def to_float_or_none(value):
+    """Returns the value as a float, or None if it is missing or NaN."""
+    if value is None or math.isnan(value):
+        return None
+    return float(value)
+
+def to_degrees(ra_str, dec_str):
+    """Converts one RA/Dec string pair to degrees; (None, None) if missing or unparsable."""
+    if not ra_str or not dec_str:
+        return None, None
+    ra_deg, dec_deg = parse_ra_dec([ra_str], [dec_str])
+    return to_float_or_none(ra_deg[0]), to_float_or_none(dec_deg[0])
+
+@st.cache_resource
 def init_db():
-    """Initializes the SQLite database and creates the observations table."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('''
+    """Initializes the SQLite database and creates the observations table.
+
+    Runs once per process; the schema does not change between reruns.
+    """
+    with write_transaction() as conn:
+        conn.execute('''
         CREATE TABLE IF NOT EXISTS observations (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             celestial_id TEXT,
@@ -60,25 +322,157 @@ def init_db():
             constellation TEXT,
             notes TEXT,
             image_path TEXT,
-            observation_date TEXT NOT NULL
+            observation_date TEXT NOT NULL,
+            ra_deg REAL,
+            dec_deg REAL
         )
     ''')
-    conn.commit()
-    conn.close()
+        # Serves the (observation_date, id) keyset order of the list and the day filter
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_obs_date ON observations(observation_date, id)")
+
+        # Databases created before RA/Dec were stored in degrees: add the columns and backfill them once
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(observations)")}
+        if 'ra_deg' not in columns:
+            conn.execute("ALTER TABLE observations ADD COLUMN ra_deg REAL")
+            conn.execute("ALTER TABLE observations ADD COLUMN dec_deg REAL")
+            rows = conn.execute(
+                "SELECT id, ra, dec FROM observations "
+                "WHERE ra IS NOT NULL AND ra != '' AND dec IS NOT NULL AND dec != ''"
+            ).fetchall()
+            if rows:
+                ids, ras, decs = zip(*rows)
+                ra_deg, dec_deg = parse_ra_dec(list(ras), list(decs))
+                conn.executemany(
+                    SQL_UPDATE_DEGREES,
+                    [(to_float_or_none(r), to_float_or_none(d), i) for r, d, i in zip(ra_deg, dec_deg, ids)]
+                )
+
+def db_version():
+    """Returns a token that changes after every write to the observations table.
+
+    All writes go through the shared connection, so its running change counter
+    is a cheap cache key for data derived from the table.
+    """
+    return get_conn().total_changes
+
+def observation_filter(day, cursor=None):
+    """Builds the WHERE clause and parameters for the observation list.
+
+    Restricts the rows to one day if given, and to those after the
+    (observation_date, id) cursor of the previous page in list order.
+    """
+    conditions, params = [], ()
+    if day:
+        next_day = day + datetime.timedelta(days=1)
+        conditions.append("observation_date >= ? AND observation_date < ?")
+        params += (day.isoformat(), next_day.isoformat())
+    if cursor:
+        conditions.append("(observation_date, id) < (?, ?)")
+        params += tuple(cursor)
+    if not conditions:
+        return "", ()
+    return "WHERE " + " AND ".join(conditions), params
+
+@st.cache_data(ttl=60, max_entries=16)
+def count_observations(version, day):
+    """Counts the observations, optionally only those made on the given day."""
+    where, params = observation_filter(day)
+    return get_conn().execute(f"SELECT COUNT(*) FROM observations {where}", params).fetchone()[0]
+
+@st.cache_data(ttl=60, max_entries=64)
+def fetch_page(version, day, cursor, limit):
+    """Fetches up to ``limit`` observations following the cursor, newest first.
+
+    Cached per database version, so paging back and forth and unrelated reruns
+    do not query SQLite again until the observations change.
+    """
+    where, params = observation_filter(day, cursor)
+    query = (
+        f"SELECT {', '.join(LIST_COLS)} FROM observations {where} "
+        "ORDER BY observation_date DESC, id DESC LIMIT ?"
+    )
+    return get_conn().execute(query, params + (limit,)).fetchall()
+
+def save_uploaded_file(uploaded_file, now=None):
+    """Streams an uploaded image into the uploads folder and returns its path.
+
+    The file name is prefixed with ``now`` (the current time by default). The
+    thumbnail is generated right away, so the first view does not have to.
+    """
+    now = now or datetime.datetime.now()
+    filename = f"{now.strftime('%Y%m%d_%H%M%S')}_{uploaded_file.name}"
+    image_path = os.path.join(UPLOAD_FOLDER, filename)
+    uploaded_file.seek(0)
+    with open(image_path, "wb") as f:
+        # Copy in 1 MiB chunks instead of materializing the whole upload at once
+        shutil.copyfileobj(uploaded_file, f, 1024 * 1024)
+    get_thumbnail(image_path)
+    return image_path
+
+def thumbnail_path(image_path, transparent=False):
+    """Returns where the thumbnail of an uploaded image is stored.
+
+    Opaque images get a JPEG thumbnail; images with transparency keep it in a PNG.
+    """
+    extension = ".png" if transparent else ".jpg"
+    return os.path.join(THUMBNAIL_FOLDER, os.path.basename(image_path) + extension)
+
+@st.cache_data
+def make_thumbnail(image_path, mtime):
+    """Writes a small thumbnail of the image, once per image version.
+
+    Returns the thumbnail path, or the original path for files Pillow cannot
+    thumbnail (e.g. SVG, or images over Pillow's decompression-bomb limit).
+    """
+    try:
+        with Image.open(image_path) as img:
+            # Apply the EXIF orientation, since the thumbnail does not keep the EXIF data
+            thumb = ImageOps.exif_transpose(img)
+            thumb.thumbnail(THUMBNAIL_SIZE)
+            transparent = thumb.mode in ("RGBA", "LA") or (thumb.mode == "P" and "transparency" in thumb.info)
+            thumb_path = thumbnail_path(image_path, transparent)
+            if transparent:
+                thumb.convert("RGBA").save(thumb_path, "PNG")
+            else:
+                thumb.convert("RGB").save(thumb_path, "JPEG", quality=85)
+    except Exception:
+        # Thumbnails are best effort and must never block a save: unreadable files
+        # (e.g. SVG) and oversized mosaics (Image.DecompressionBombError) show the original
+        return image_path
+    return thumb_path
+
+def get_thumbnail(image_path):
+    """Returns a thumbnail to display for the image, generating it lazily."""
+    try:
+        mtime = os.path.getmtime(image_path)
+    except OSError:
+        # Let st.image report the missing file as before
+        return image_path
+    return make_thumbnail(image_path, mtime)
+
+def remove_image(image_path):
+    """Deletes an uploaded image and its thumbnail, if present."""
+    for path in (image_path, thumbnail_path(image_path), thumbnail_path(image_path, transparent=True)):
+        Path(path).unlink(missing_ok=True)
+
+def insert_observations(rows):
+    """Inserts observation rows (in SQL_INSERT_OBSERVATION order) in one transaction."""
+    with write_transaction() as conn:
+        conn.executemany(SQL_INSERT_OBSERVATION, rows)
 
 def delete_record(record_id):
     """Deletes an observation record with the specified ID from the database."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT image_path FROM observations WHERE id=?", (record_id,))
-    image_path = c.fetchone()[0]
+    with write_transaction() as conn:
+        if SQLITE_HAS_RETURNING:
+            # One statement deletes the row and hands back its image path
+            row = conn.execute(SQL_DELETE_OBSERVATION_RETURNING, (record_id,)).fetchone()
+        else:
+            row = conn.execute(SQL_SELECT_IMAGE_PATH, (record_id,)).fetchone()
+            conn.execute(SQL_DELETE_OBSERVATION, (record_id,))
+    image_path = row[0] if row else None
     
-    c.execute("DELETE FROM observations WHERE id=?", (record_id,))
-    conn.commit()
-    conn.close()
-    
-    if image_path and os.path.exists(image_path):
-        os.remove(image_path)
+    if image_path:
+        remove_image(image_path)
     
     st.success(lang["success_delete"])
     st.session_state.editing = None
@@ -86,25 +480,15 @@ def delete_record(record_id):
 
 def update_record(record_id, new_notes, new_image_file):
     """Updates an observation record with the specified ID."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-
     new_image_path = st.session_state.editing['image_path']
     if new_image_file:
-        if new_image_path and os.path.exists(new_image_path):
-            os.remove(new_image_path)
+        if new_image_path:
+            remove_image(new_image_path)
         
-        filename = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{new_image_file.name}"
-        new_image_path = os.path.join(UPLOAD_FOLDER, filename)
-        with open(new_image_path, "wb") as f:
-            f.write(new_image_file.getbuffer())
-
-    c.execute(
-        "UPDATE observations SET notes=?, image_path=? WHERE id=?",
-        (new_notes, new_image_path, record_id)
-    )
-    conn.commit()
-    conn.close()
+        new_image_path = save_uploaded_file(new_image_file)
+
+    with write_transaction() as conn:
+        conn.execute(SQL_UPDATE_OBSERVATION, (new_notes, new_image_path, record_id))
     st.success(lang["success_update"])
     st.session_state.editing = None
     st.rerun()
@@ -116,17 +500,122 @@ def set_edit_mode(record_data):
 def set_selected_date():
     """Saves the date from the calendar widget to the session state."""
     st.session_state.selected_date = st.session_state.date_picker
-    st.session_state.current_page = 0
-    st.rerun()
+    st.session_state.cursor_stack = []
 
 def set_today_date():
-    """Sets the selected date to today's date and re-runs."""
+    """Sets the selected date to today's date."""
     st.session_state.selected_date = datetime.date.today()
-    st.session_state.current_page = 0
-    st.rerun()
+    st.session_state.cursor_stack = []
+
+def next_page(cursor):
+    """Moves the observation list past the given (observation_date, id) cursor."""
+    st.session_state.cursor_stack.append(cursor)
+
+def previous_page():
+    """Moves the observation list back to the previous page."""
+    st.session_state.cursor_stack.pop()
+
+# --- HTML Export Fixes ---
+def create_image_link(image_path):
+    """Creates an HTML link with a small thumbnail for the image."""
+    if image_path and os.path.exists(image_path):
+        # Use data URI to embed the image directly into the HTML
+        with open(image_path, "rb") as f:
+            encoded_string = base64.b64encode(f.read()).decode()
+        
+        # The HTML for the link and image thumbnail
+        return f'<a href="data:image/png;base64,{encoded_string}" target="_blank">' \
+               f'<img src="data:image/png;base64,{encoded_string}" style="width:50px;height:auto;">' \
+               f'</a>'
+    return ""
+
+@st.cache_data(ttl=60, max_entries=1)
+def fetch_all_observations(version):
+    """Reads the whole observations table once per database version.
+
+    Shared by the exports and the star map, so a change costs one full-table read.
+    Only the latest version is kept; older copies of the table are evicted.
+    """
+    return pd.read_sql_query("SELECT * FROM observations ORDER BY observation_date DESC", get_conn())
+
+@st.cache_data(ttl=60, max_entries=2)
+def build_exports(version, language):
+    """Serializes the observations table to HTML, JSON and CSV for download.
+
+    Cached per database version and UI language, so the serialization only
+    reruns after the observations change.
+    """
+    texts = translations[language]
+    df = fetch_all_observations(version)
+
+    # Apply the HTML function to the image_path column
+    html_df = df.copy()
+    html_df['image_path'] = html_df['image_path'].apply(create_image_link)
+
+    # Create the full HTML content with proper encoding header
+    html_content = f'''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <title>{texts['project_name']} - {texts['tab_data']}</title>
+        <style>
+            table {{ width: 100%; border-collapse: collapse; }}
+            th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+            th {{ background-color: #f2f2f2; }}
+        </style>
+    </head>
+    <body>
+        <h2>{texts['log_header']}</h2>
+        {html_df.to_html(index=False, escape=False)}
+    </body>
+    </html>
+    '''
+
+    json_data = df.to_json(orient='records', force_ascii=False)
+    csv_data = df.to_csv(index=False).encode('utf-8')
+    return html_content.encode('utf-8'), json_data, csv_data
+
+def load_viz_data(version):
+    """Selects the observations with known coordinates for the star map.
+
+    RA/Dec are stored in degrees at insert time, so no parsing happens here.
+    """
+    df = fetch_all_observations(version)
+    df = df.loc[df['ra_deg'].notna() & df['dec_deg'].notna(), list(VIZ_COLS)]
+    return df.rename(columns=VIZ_COLS)
+
+@st.cache_data(ttl=60, max_entries=2)
+def build_map_figure(version, language):
+    """Builds the star-map figure, once per database version and UI language.
+
+    Bounded to one figure per language, so past versions do not pile up.
+
+    Returns None when no observation has coordinates.
+    """
+    df_viz = load_viz_data(version)
+    if df_viz.empty:
+        return None
+
+    # Per-row observation count of each object, without building and joining a counts frame
+    df_viz['count'] = df_viz.groupby('name', sort=False, dropna=False)['name'].transform('size')
+
+    # A flat RA/Dec map: 2D WebGL scatter instead of a 3D scene with a constant z
+    fig = px.scatter(df_viz,
+                     x='ra',
+                     y='dec',
+                     text='name',
+                     hover_name='name',
+                     color='count',
+                     size='count',
+                     hover_data={'ra': True, 'dec': True, 'notes': True, 'count': True},
+                     render_mode='webgl')
+
+    fig.update_traces(marker=dict(line=dict(width=2, color='DarkSlateGrey')), textposition='top center')
+    fig.update_layout(title=translations[language]['map_title'])
+    return fig
 
 # --- Streamlit UI ---
-st.set_page_config(page_title=PROJECT_NAME, layout="wide")
 st.title(f"🌌 {lang['project_name']}")
 st.markdown(lang['app_description'])
 
@@ -154,67 +643,41 @@ with tab1:
     st.sidebar.header(lang['sidebar_header'])
 
     # Display current date and time
+    # One timestamp per rerun, shared by the header, the image file name and the record
     now = datetime.datetime.now()
-    st.sidebar.markdown(f"**{lang['current_time']}:** {now.strftime('%Y-%m-%d %H:%M:%S')}")
+    now_str = now.strftime('%Y-%m-%d %H:%M:%S')
+    st.sidebar.markdown(f"**{lang['current_time']}:** {now_str}")
 
-    object_search_input = st.sidebar.text_input(lang['search_label'], placeholder=lang['search_placeholder'])
+    # The query only reaches the script on submit (button or Enter), not when the field loses focus
+    with st.sidebar.form("search_form"):
+        object_search_input = st.text_input(lang['search_label'], placeholder=lang['search_placeholder'])
+        st.form_submit_button(lang['search_button'])
     found_object = None
 
     # --- UPDATED SEARCH LOGIC ---
-    if object_search_input:
-        search_query = object_search_input.lower().replace(" ", "")
-        
-        # 1. Exact match search across all relevant fields
-        for obj in CELESTIAL_DATA:
-            obj_id = obj.get('id', '').lower().replace(" ", "")
-            obj_name_en = obj.get('name_en', '').lower().replace(" ", "")
-            try:
-                obj_name_kr = obj.get('name_kr', '').lower().replace(" ", "")
-            except:
-                obj_name_kr = ''
-                
-            # Check aliases
-            aliases_en = [a.lower().replace(" ", "") for a in obj.get('aliases_en', []) if a]
-            aliases_kr = [a.lower().replace(" ", "") for a in obj.get('aliases_kr', []) if a]
-            
-            if obj_id == search_query or \
-               obj_name_en == search_query or \
-               obj_name_kr == search_query or \
-               search_query in aliases_en or \
-               search_query in aliases_kr:
-                found_object = obj
-                break
-        
-        # 2. If no exact match, perform a more flexible "starts with" search
-        if not found_object:
-            for obj in CELESTIAL_DATA:
-                obj_id = obj.get('id', '').lower().replace(" ", "")
-                obj_name_en = obj.get('name_en', '').lower().replace(" ", "")
-                try:
-                    obj_name_kr = obj.get('name_kr', '').lower().replace(" ", "")
-                except:
-                    obj_name_kr = ''
-                    
-                aliases_en = [a.lower().replace(" ", "") for a in obj.get('aliases_en', []) if a]
-                aliases_kr = [a.lower().replace(" ", "") for a in obj.get('aliases_kr', []) if a]
-
-                if obj_id.startswith(search_query) or \
-                   obj_name_en.startswith(search_query) or \
-                   obj_name_kr.startswith(search_query) or \
-                   any(alias.startswith(search_query) for alias in aliases_en) or \
-                   any(alias.startswith(search_query) for alias in aliases_kr):
-                    found_object = obj
-                    break
+    if object_search_input == st.session_state.last_query:
+        # Reruns triggered by other widgets reuse the previous search result
+        found_object = st.session_state.last_result
+    elif object_search_input:
+        found_object = search_celestial(normalize_term(object_search_input)) or search_celestial_words(object_search_input)
+    st.session_state.last_query = object_search_input
+    st.session_state.last_result = found_object
 
     st.session_state.found_object = found_object
 
+    # Resolve the found object's fields once instead of per widget
+    fo = st.session_state.found_object or {}
+    defaults = {k: fo.get(k) for k in ('id', 'name_en', 'name_kr', 'ra', 'dec', 'magnitude')}
+
     with st.sidebar.form("new_observation_form"):
-        celestial_id = st.text_input(lang['celestial_id'], value=st.session_state.found_object['id'] if st.session_state.found_object else "", disabled=True)
-        celestial_name_en = st.text_input(lang['celestial_name_en'], value=st.session_state.found_object['name_en'] if st.session_state.found_object else "", disabled=True)
-        celestial_name_kr = st.text_input(lang['celestial_name_kr'], value=st.session_state.found_object['name_kr'] if st.session_state.found_object else "", disabled=True)
-        ra = st.text_input(lang['ra_label'], value=st.session_state.found_object['ra'] if st.session_state.found_object and 'ra' in st.session_state.found_object else "", disabled=True)
-        dec = st.text_input(lang['dec_label'], value=st.session_state.found_object['dec'] if st.session_state.found_object and 'dec' in st.session_state.found_object else "", disabled=True)
-        magnitude = st.text_input(lang['magnitude'], value=st.session_state.found_object['magnitude'] if st.session_state.found_object and 'magnitude' in st.session_state.found_object else "", disabled=True)
+        # Display-only fields as one markdown block rather than disabled input widgets
+        st.markdown("  \n".join(
+            f"**{lang[label]}:** {'-' if defaults[key] in (None, '') else defaults[key]}"
+            for label, key in (
+                ('celestial_id', 'id'), ('celestial_name_en', 'name_en'), ('celestial_name_kr', 'name_kr'),
+                ('ra_label', 'ra'), ('dec_label', 'dec'), ('magnitude', 'magnitude'),
+            )
+        ))
         notes = st.text_area(lang['notes_label'], placeholder=lang['notes_placeholder'])
         uploaded_file = st.file_uploader(lang['upload_file'], type=["png", "jpg", "jpeg", "svg"])
         submitted = st.form_submit_button(lang['save_record'])
@@ -223,15 +686,14 @@ with tab1:
             if st.session_state.found_object:
                 image_path = None
                 if uploaded_file is not None:
-                    filename = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{uploaded_file.name}"
-                    image_path = os.path.join(UPLOAD_FOLDER, filename)
-                    with open(image_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-
-                conn = sqlite3.connect(DB_NAME)
-                c = conn.cursor()
-                c.execute(
-                    "INSERT INTO observations (celestial_id, celestial_name_en, celestial_name_kr, catalog, ra, dec, magnitude, type, constellation, notes, image_path, observation_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    image_path = save_uploaded_file(uploaded_file, now)
+
+                # Catalogs built with --numeric-coords already carry degrees
+                ra_deg = st.session_state.found_object.get('ra_deg')
+                dec_deg = st.session_state.found_object.get('dec_deg')
+                if ra_deg is None or dec_deg is None:
+                    ra_deg, dec_deg = to_degrees(st.session_state.found_object.get('ra'), st.session_state.found_object.get('dec'))
+                insert_observations([
                     (
                         st.session_state.found_object.get('id'), 
                         st.session_state.found_object.get('name_en'), 
@@ -242,11 +704,10 @@ with tab1:
                         st.session_state.found_object.get('magnitude'),
                         st.session_state.found_object.get('type'), 
                         st.session_state.found_object.get('constellation'),
-                        notes, image_path, datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                        notes, image_path, now_str,
+                        ra_deg, dec_deg
                     )
-                )
-                conn.commit()
-                conn.close()
+                ])
                 st.sidebar.success(lang['success_save'])
                 st.session_state.found_object = None
                 st.rerun()
@@ -254,255 +715,201 @@ with tab1:
                 st.sidebar.error(lang['error_search'])
 
     # --- Observation Log List Section ---
-    st.header(lang['log_header'])
-    col1, col2 = st.columns([0.7, 0.3])
-    with col1:
-        st.date_input(lang['select_date'], key="date_picker", on_change=set_selected_date)
-    with col2:
-        st.markdown(" ") # Spacer
-        st.button(lang['today'], on_click=set_today_date)
-
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    if st.session_state.selected_date:
-        query = "SELECT * FROM observations WHERE observation_date LIKE ? ORDER BY observation_date DESC"
-        c.execute(query, (f"{st.session_state.selected_date.strftime('%Y-%m-%d')}%",))
-    else:
-        query = "SELECT * FROM observations ORDER BY observation_date DESC"
-        c.execute(query)
-
-    all_observations = c.fetchall()
-    conn.close()
-
-    ITEMS_PER_PAGE = 10
-    total_records = len(all_observations)
-    total_pages = (total_records + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
-
-    if not st.session_state.selected_date and total_records > ITEMS_PER_PAGE:
-        start_idx = st.session_state.current_page * ITEMS_PER_PAGE
-        end_idx = start_idx + ITEMS_PER_PAGE
-        paginated_observations = all_observations[start_idx:end_idx]
-
-        col1, col2, col3 = st.columns([1, 1, 1])
+    @st.fragment
+    def observation_list():
+        """Renders the date filter, pagination and observation list.
+
+        Runs as a fragment, so paging and switching in and out of edit mode only
+        rerun this pane instead of the whole app.
+        """
+        st.header(lang['log_header'])
+        col1, col2 = st.columns([0.7, 0.3])
         with col1:
-            if st.session_state.current_page > 0:
-                if st.button(lang['previous']):
-                    st.session_state.current_page -= 1
-                    st.rerun()
+            st.date_input(lang['select_date'], key="date_picker", on_change=set_selected_date)
         with col2:
-            st.write(f"{lang['page']} {st.session_state.current_page + 1}/{total_pages}")
-        with col3:
-            if st.session_state.current_page < total_pages - 1:
-                if st.button(lang['next']):
-                    st.session_state.current_page += 1
-                    st.rerun()
-        st.markdown("---")
-    else:
-        paginated_observations = all_observations
-
-    if not paginated_observations:
-        st.info(lang['no_records'])
-    else:
-        for obs in paginated_observations:
-            (
-                obs_id, celestial_id, celestial_name_en, celestial_name_kr, catalog,
-                ra, dec, magnitude, celestial_type, constellation,
-                notes, image_path, observation_date
-            ) = obs
-
-            if st.session_state.language == 'en':
-                celestial_name = celestial_name_en
+            st.markdown(" ") # Spacer
+            st.button(lang['today'], on_click=set_today_date)
+
+        ITEMS_PER_PAGE = 10
+        total_records = count_observations(db_version(), st.session_state.selected_date)
+        total_pages = (total_records + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
+        cursor_stack = st.session_state.cursor_stack
+
+        # Keyset pagination: seek past the last (observation_date, id) of the
+        # previous page on the date index instead of skipping rows with OFFSET.
+        # One extra row tells whether there is a next page.
+        while True:
+            paginated_observations = fetch_page(
+                db_version(), st.session_state.selected_date,
+                cursor_stack[-1] if cursor_stack else None, ITEMS_PER_PAGE + 1
+            )
+            # Step back if the records of this page were deleted in the meantime
+            if paginated_observations or not cursor_stack:
+                break
+            cursor_stack.pop()
+        has_more = len(paginated_observations) > ITEMS_PER_PAGE
+        paginated_observations = paginated_observations[:ITEMS_PER_PAGE]
+        current_page = len(cursor_stack)
+
+        if cursor_stack or has_more:
+            col1, col2, col3 = st.columns([1, 1, 1])
+            with col1:
+                if cursor_stack:
+                    st.button(lang['previous'], on_click=previous_page)
+            with col2:
+                st.write(f"{lang['page']} {current_page + 1}/{max(total_pages, current_page + 1)}")
+            with col3:
+                if has_more:
+                    last = paginated_observations[-1]
+                    # LIST_COLS starts with id and ends with observation_date
+                    st.button(lang['next'], on_click=next_page, args=((last[-1], last[0]),))
+            st.markdown("---")
+
+        if not paginated_observations:
+            st.info(lang['no_records'])
+        else:
+            # One table for the whole page; only the selected or edited record gets a detail pane
+            name_column = 'celestial_name_en' if st.session_state.language == 'en' else 'celestial_name_kr'
+            df_page = pd.DataFrame(paginated_observations, columns=LIST_COLS)
+            table = st.dataframe(
+                df_page[[name_column, 'observation_date', 'celestial_id', 'catalog', 'magnitude', 'type', 'constellation', 'notes']],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    name_column: lang[name_column],
+                    'observation_date': lang['observation_date'],
+                    'celestial_id': lang['celestial_id'],
+                    'catalog': lang['catalog'],
+                    'magnitude': lang['magnitude'],
+                    'type': lang['type'],
+                    'constellation': lang['constellation'],
+                    'notes': lang['notes_label'],
+                },
+                on_select="rerun",
+                selection_mode="single-row",
+                # A fresh key per page and per database version clears stale row selections
+                key=f"observation_table_{db_version()}_{st.session_state.selected_date}_{current_page}",
+            )
+
+            editing_id = st.session_state.editing['id'] if st.session_state.editing else None
+            page_ids = [obs[0] for obs in paginated_observations]
+            if editing_id in page_ids:
+                obs = paginated_observations[page_ids.index(editing_id)]
+            elif table.selection.rows:
+                obs = paginated_observations[table.selection.rows[0]]
             else:
-                celestial_name = celestial_name_kr
+                obs = None
+                st.caption(lang['select_record_hint'])
+
+            if obs:
+                # Cached pages hold plain tuples (sqlite3.Row does not pickle), so name the fields here
+                record = dict(zip(LIST_COLS, obs))
+                obs_id = record['id']
+                image_path = record['image_path']
+                celestial_name = record[name_column]
+                details = (
+                    f"**{lang['celestial_id']}:** {record['celestial_id']}, "
+                    f"**{lang['ra_label']}:** `{record['ra']}`, **{lang['dec_label']}:** `{record['dec']}`  \n"
+                    f"**Catalog:** {record['catalog']}, **Magnitude:** {record['magnitude']}, "
+                    f"**Type:** {record['type']}, **Constellation:** {record['constellation']}"
+                )
                 
-            if st.session_state.editing and st.session_state.editing['id'] == obs_id:
-                with st.expander(f"**{celestial_name}** - {observation_date}", expanded=True):
-                    st.markdown(f"### {lang['editing_record']}")
-                    st.markdown(f"**{lang['celestial_id']}:** {celestial_id}, **{lang['ra_label']}:** `{ra}`, **{lang['dec_label']}:** `{dec}`")
-                    st.markdown(f"**Catalog:** {catalog}, **Magnitude:** {magnitude}, **Type:** {celestial_type}, **Constellation:** {constellation}")
-
-                    new_notes = st.text_area(lang['new_notes'], value=notes)
-                    if image_path:
-                        st.image(image_path, caption=lang['image_caption'], width=200)
-                    new_image_file = st.file_uploader(lang['new_image'], type=["png", "jpg", "jpeg", "svg"], key=f"edit_file_{obs_id}")
+                if obs_id == editing_id:
+                    with st.expander(f"**{celestial_name}** - {record['observation_date']}", expanded=True):
+                        st.markdown(f"### {lang['editing_record']}\n\n{details}")
+
+                        new_notes = st.text_area(lang['new_notes'], value=record['notes'])
+                        if image_path:
+                            # The editor shows the full-resolution original; the list view uses thumbnails
+                            try:
+                                st.image(image_path, caption=lang['image_caption'], width=200)
+                            except FileNotFoundError:
+                                st.warning(lang['file_not_found'])
+                        new_image_file = st.file_uploader(lang['new_image'], type=["png", "jpg", "jpeg", "svg"], key=f"edit_file_{obs_id}")
                     
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button(lang['save_changes'], key=f"edit_complete_{obs_id}"):
-                            update_record(obs_id, new_notes, new_image_file)
-                    with col2:
-                        if st.button(lang['cancel'], key=f"edit_cancel_{obs_id}"):
-                            st.session_state.editing = None
-                            st.rerun()
-            else:
-                with st.expander(f"**{celestial_name}** - {observation_date}"):
-                    st.write(f"**{lang['celestial_id']}:** {celestial_id}, **{lang['ra_label']}:** `{ra}`, **{lang['dec_label']}:** `{dec}`")
-                    st.write(f"**Catalog:** {catalog}, **Magnitude:** {magnitude}")
-                    st.write(f"**Type:** {celestial_type}, **Constellation:** {constellation}")
-                    st.write(f"**{lang['notes_label']}:** {notes}")
-                    if image_path:
-                        try:
-                            st.image(image_path, caption=f"{celestial_name} Image")
-                        except FileNotFoundError:
-                            st.warning(lang['file_not_found'])
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            if st.button(lang['save_changes'], key=f"edit_complete_{obs_id}"):
+                                update_record(obs_id, new_notes, new_image_file)
+                        with col2:
+                            st.button(lang['cancel'], key=f"edit_cancel_{obs_id}", on_click=set_edit_mode, args=(None,))
+                else:
+                    with st.expander(f"**{celestial_name}** - {record['observation_date']}", expanded=True):
+                        # One markdown element instead of a st.write per line
+                        st.markdown(f"{details}  \n**{lang['notes_label']}:** {record['notes']}")
+                        if image_path:
+                            try:
+                                st.image(get_thumbnail(image_path), caption=f"{celestial_name} Image")
+                            except FileNotFoundError:
+                                st.warning(lang['file_not_found'])
                     
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button(lang['delete'], key=f"delete_{obs_id}"):
-                            delete_record(obs_id)
-                    with col2:
-                        if st.button(lang['edit'], key=f"edit_{obs_id}"):
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            if st.button(lang['delete'], key=f"delete_{obs_id}"):
+                                delete_record(obs_id)
+                        with col2:
                             record_data = {
                                 "id": obs_id,
-                                "celestial_name_en": celestial_name_en,
-                                "celestial_name_kr": celestial_name_kr,
-                                "notes": notes,
+                                "celestial_name_en": record['celestial_name_en'],
+                                "celestial_name_kr": record['celestial_name_kr'],
+                                "notes": record['notes'],
                                 "image_path": image_path
                             }
-                            set_edit_mode(record_data)
-                            st.rerun()
+                            st.button(lang['edit'], key=f"edit_{obs_id}", on_click=set_edit_mode, args=(record_data,))
+
+    observation_list()
 
 # ======================================================================================================
 #                                    Data Management & Visualization Tab
 # ======================================================================================================
 with tab2:
-    st.header(lang['export_data_header'])
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT * FROM observations ORDER BY observation_date DESC")
-    db_rows = c.fetchall()
-    conn.close()
-    
-    column_names = [description[0] for description in c.description]
-    df = pd.DataFrame(db_rows, columns=column_names)
-
-    # --- HTML Export Fixes ---
-    def create_image_link(image_path):
-        """Creates an HTML link with a small thumbnail for the image."""
-        if image_path and os.path.exists(image_path):
-            image_name = os.path.basename(image_path)
-            # Use data URI to embed the image directly into the HTML
-            import base64
-            with open(image_path, "rb") as f:
-                encoded_string = base64.b64encode(f.read()).decode()
-            
-            # The HTML for the link and image thumbnail
-            return f'<a href="data:image/png;base64,{encoded_string}" target="_blank">' \
-                   f'<img src="data:image/png;base64,{encoded_string}" style="width:50px;height:auto;">' \
-                   f'</a>'
-        return ""
-
-    # Apply the HTML function to the image_path column
-    html_df = df.copy()
-    html_df['image_path'] = html_df['image_path'].apply(create_image_link)
-
-    # Create the full HTML content with proper encoding header
-    html_content = f'''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>{lang['project_name']} - {lang['tab_data']}</title>
-        <style>
-            table {{ width: 100%; border-collapse: collapse; }}
-            th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-            th {{ background-color: #f2f2f2; }}
-        </style>
-    </head>
-    <body>
-        <h2>{lang['log_header']}</h2>
-        {html_df.to_html(index=False, escape=False)}
-    </body>
-    </html>
-    '''
-    
-    st.download_button(
-        label=lang['export_html'],
-        data=html_content.encode('utf-8'),
-        file_name="astro_notebook_observations.html",
-        mime="text/html"
-    )
+    @st.fragment
+    def data_management():
+        """Renders the export buttons and the star map.
+
+        Runs as a fragment, so clicking a download button does not rerun the
+        observation log.
+        """
+        st.header(lang['export_data_header'])
+        html_data, json_data, csv_data = build_exports(db_version(), st.session_state.language)
+
+        st.download_button(
+            label=lang['export_html'],
+            data=html_data,
+            file_name="astro_notebook_observations.html",
+            mime="text/html"
+        )
 
-    # Other download buttons remain unchanged
-    json_data = df.to_json(orient='records', force_ascii=False)
-    st.download_button(
-        label=lang['export_json'],
-        data=json_data,
-        file_name="astro_notebook_observations.json",
-        mime="application/json"
-    )
+        st.download_button(
+            label=lang['export_json'],
+            data=json_data,
+            file_name="astro_notebook_observations.json",
+            mime="application/json"
+        )
 
-    csv_data = df.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label=lang['export_csv'],
-        data=csv_data,
-        file_name="astro_notebook_observations.csv",
-        mime="text/csv"
-    )
+        st.download_button(
+            label=lang['export_csv'],
+            data=csv_data,
+            file_name="astro_notebook_observations.csv",
+            mime="text/csv"
+        )
 
-    with open(DB_NAME, "rb") as f:
-        db_file_bytes = f.read()
-    st.download_button(
-        label=lang['export_db'],
-        data=db_file_bytes,
-        file_name=DB_NAME,
-        mime="application/octet-stream"
-    )
+        st.download_button(
+            label=lang['export_db'],
+            data=read_db_bytes(db_version()),
+            file_name=DB_NAME,
+            mime="application/octet-stream"
+        )
     
     
-    st.markdown("---")
+        st.markdown("---")
     
-    st.header(lang['map_header'])
+        st.header(lang['map_header'])
     
-    def parse_ra_dec(ra_str, dec_str):
-        try:
-            if ra_str and dec_str:
-                coord = SkyCoord(ra=ra_str, dec=dec_str, unit=(u.hourangle, u.deg))
-                return coord.ra.deg, coord.dec.deg
-        except:
-            return None, None
-        return None, None
+        fig = build_map_figure(db_version(), st.session_state.language)
+        if fig is not None:
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info(lang['no_map_data'])
 
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT celestial_name_en, celestial_name_kr, notes, celestial_id, ra, dec FROM observations")
-    all_observations = c.fetchall()
-    conn.close()
-
-    viz_data = []
-    for obs in all_observations:
-        name_en, name_kr, notes, id, ra, dec = obs
-        parsed_ra, parsed_dec = parse_ra_dec(ra, dec)
-        if parsed_ra is not None and parsed_dec is not None:
-            viz_data.append({
-                "name": name_en,
-                "name_kr": name_kr, 
-                "ra": parsed_ra, 
-                "dec": parsed_dec, 
-                "notes": notes, 
-                "id": id
-            })
-    
-    if viz_data:
-        df_viz = pd.DataFrame(viz_data)
-        
-        counts = df_viz['name'].value_counts().reset_index()
-        counts.columns = ['name', 'count']
-        
-        df_viz = df_viz.merge(counts, on='name')
-        
-        fig = px.scatter_3d(df_viz, 
-                            x='ra', 
-                            y='dec', 
-                            z=[0]*len(df_viz), 
-                            text='name',
-                            hover_name='name',
-                            color='count', 
-                            size='count',  
-                            hover_data={'ra': True, 'dec': True, 'notes': True, 'count': True})
-        
-        fig.update_traces(marker=dict(line=dict(width=2, color='DarkSlateGrey')))
-        fig.update_layout(title=lang['map_title'], scene_camera=dict(eye=dict(x=1.2, y=1.2, z=0.6)))
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.info(lang['no_map_data'])
\ No newline at end of file
+    data_management()
@@ -2,4 +2,5 @@ pip install --upgrade pip
 pip install watchdog
 pip install astropy
 pip install plotly
-pip install streamlit
\ No newline at end of file
+pip install "streamlit>=1.37"
+pip install orjson
\ No newline at end of file
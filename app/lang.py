@@ -9,6 +9,7 @@ translations = {
         "current_time": "Current Time",
         "search_label": "Enter celestial object name or ID",
         "search_placeholder": "Andromeda Galaxy, M31, Sirius",
+        "search_button": "Search",
         "celestial_id": "Celestial ID",
         "celestial_name_en": "English Name",
         "celestial_name_kr": "Korean Name",
@@ -47,7 +48,12 @@ translations = {
         "page": "Page",
         "previous": "Previous Page",
         "next": "Next Page",
-        "language_selector": "Select Language"
+        "language_selector": "Select Language",
+        "observation_date": "Observation Date",
+        "catalog": "Catalog",
+        "type": "Type",
+        "constellation": "Constellation",
+        "select_record_hint": "Select a row to view, edit or delete the record."
     },
     "ko": {
         "project_name": "우주 수첩 2025",
@@ -58,6 +64,7 @@ translations = {
         "current_time": "현재 시각",
         "search_label": "천체 이름 또는 ID를 입력하세요",
         "search_placeholder": "안드로메다 은하, M31, 시리우스",
+        "search_button": "검색",
         "celestial_id": "천체 ID",
         "celestial_name_en": "영문 이름",
         "celestial_name_kr": "한글 이름",
@@ -96,6 +103,11 @@ translations = {
         "page": "페이지",
         "previous": "이전 페이지",
         "next": "다음 페이지",
-        "language_selector": "언어 선택"
+        "language_selector": "언어 선택",
+        "observation_date": "관측 일시",
+        "catalog": "카탈로그",
+        "type": "유형",
+        "constellation": "별자리",
+        "select_record_hint": "행을 선택하면 기록을 보거나 편집, 삭제할 수 있습니다."
     }
 }
\ No newline at end of file
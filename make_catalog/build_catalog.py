@@ -4,9 +4,24 @@
 import json
 import re
 import argparse
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+# orjson은 선택 의존성: 있으면 빠른 파서를 사용
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# hangulize는 선택 의존성: 모듈 로드 시 한 번만 임포트 시도
+try:
+    from hangulize import hangulize as _hangulize
+    from hangulize.langs.eng import English as _English
+except Exception:
+    _hangulize = None
+
 # ---------------- 한국어 이름 매핑(필요 시 확장) ----------------
 KO_MAP = {
     # Messier(대표 예시)
@@ -62,21 +77,21 @@ SOLAR_SYSTEM = [
 
 
 # ---------------- 유틸 ----------------
+# 대시/도/따옴표 변형 → 표준 문자 (translate 한 번으로 처리)
+_NORM_TRANS = str.maketrans({
+    "−": "-", "–": "-", "—": "-",
+    "º": "°",
+    "’": "'",
+    "“": '"', "”": '"', "″": '"',
+})
+
 def norm_str(x: Any) -> Optional[str]:
     if x is None:
         return None
     s = str(x).strip()
     if not s:
         return None
-    s = (s.replace("−", "-")
-           .replace("–", "-")
-           .replace("—", "-")
-           .replace("º", "°")
-           .replace("’", "'")
-           .replace("“", "\"")
-           .replace("”", "\"")
-           .replace("″", '"'))
-    return s
+    return s.translate(_NORM_TRANS)
 
 def float_or_none(x: Any) -> Optional[float]:
     try:
@@ -92,29 +107,30 @@ def hms_to_str(h: int, m: int, s: float) -> str:
 def dms_to_str(sign: int, d: int, m: int, s: float) -> str:
     return f"{'+' if sign >= 0 else '-'}{d:02d}:{m:02d}:{s:05.2f}"
 
-def first(*vals):
-    for v in vals:
-        if v is None:
-            continue
-        if isinstance(v, str) and v.strip() == "":
-            continue
-        return v
-    return None
+def hms_str_to_deg(t: str) -> float:
+    """"HH:MM:SS.ss" → 도 단위 적경."""
+    h, m, s = t.split(":")
+    return round((int(h) + int(m) / 60.0 + float(s) / 3600.0) * 15.0, 6)
+
+def dms_str_to_deg(t: str) -> float:
+    """"±DD:MM:SS.ss" → 도 단위 적위."""
+    sign = -1.0 if t.startswith("-") else 1.0
+    d, m, s = t.lstrip("+-").split(":")
+    return round(sign * (int(d) + int(m) / 60.0 + float(s) / 3600.0), 6)
 
 # ---------------- 간단 영→한 발음 변환 ----------------
 # --- hangulize 기반 영→한 변환 ---
+@lru_cache(maxsize=None)
 def eng_to_hangul(name: str) -> str:
     """
     영어 이름을 한국어 표기로 변환.
     - hangulize가 설치되어 있지 않거나 변환 실패 시 원문을 반환(안전).
     - 입력이 빈 값/None이면 빈 문자열 반환.
+    - 같은 이름(별칭 포함)이 반복되므로 결과를 캐시.
     """
     if not name:
         return ""
-    try:
-        from hangulize import hangulize
-        from hangulize.langs.eng import English
-    except Exception:
+    if _hangulize is None:
         # 라이브러리 미설치 등: 원문 반환
         return str(name)
 
@@ -129,42 +145,52 @@ def eng_to_hangul(name: str) -> str:
     out = []
     for t in tokens:
         try:
-            ko = hangulize(t, English)
+            ko = _hangulize(t, _English)
             out.append(ko)
         except Exception:
             # 토큰 단위 실패 시 해당 토큰은 원문 유지
             out.append(t)
     return "".join(out)
 
+def ko_for(name: str) -> str:
+    """한국어 표기: KO_MAP 우선, 없으면 발음 변환(eng_to_hangul 캐시 사용)."""
+    return KO_MAP.get(name) or eng_to_hangul(name)
+
 
 # 아주 간단한 규칙 기반 변환입니다(완벽 X). KO_MAP이 우선.
-def eng_to_hangul_simple(name: str) -> str:
-    if not name:
-        return ""
-    # 특수기호 제거/토큰화
-    txt = re.sub(r"[^A-Za-z0-9\s\-]", " ", name)
-    tokens = [t for t in re.split(r"[\s\-]+", txt) if t]
-    # 간단 매핑
-    repl = [
+# 변환 규칙/표는 호출마다 만들지 않도록 모듈 로드 시 한 번만 준비
+_SIMPLE_STRIP_RE = re.compile(r"[^A-Za-z0-9\s\-]")
+_SIMPLE_SPLIT_RE = re.compile(r"[\s\-]+")
+_SIMPLE_REPL = [
+    (re.compile(a), b) for a, b in [
         (r"ph", "프"), (r"ch", "치"), (r"sh", "시"), (r"th", "스"), (r"gh", "그"),
         (r"ck", "크"), (r"qu", "쿠"), (r"x", "크스"), (r"ce", "스"), (r"ci", "시"),
         (r"ge", "지"), (r"gi", "지"),
     ]
-    vowel = {
-        "a":"아","e":"에","i":"이","o":"오","u":"우","y":"이",
-        "aa":"아","ee":"이","oo":"우","ai":"아이","au":"아우","ei":"에이","ou":"오우",
-    }
-    cons = {
-        "b":"브","c":"크","d":"드","f":"프","g":"그","h":"흐","j":"지","k":"크","l":"르",
-        "m":"므","n":"느","p":"프","q":"쿠","r":"르","s":"스","t":"트","v":"브","w":"우",
-        "z":"즈",
-    }
+]
+_SIMPLE_VOWEL = {
+    "a":"아","e":"에","i":"이","o":"오","u":"우","y":"이",
+    "aa":"아","ee":"이","oo":"우","ai":"아이","au":"아우","ei":"에이","ou":"오우",
+}
+_SIMPLE_CONS = {
+    "b":"브","c":"크","d":"드","f":"프","g":"그","h":"흐","j":"지","k":"크","l":"르",
+    "m":"므","n":"느","p":"프","q":"쿠","r":"르","s":"스","t":"트","v":"브","w":"우",
+    "z":"즈",
+}
+
+def eng_to_hangul_simple(name: str) -> str:
+    if not name:
+        return ""
+    # 특수기호 제거/토큰화
+    txt = _SIMPLE_STRIP_RE.sub(" ", name)
+    tokens = [t for t in _SIMPLE_SPLIT_RE.split(txt) if t]
+    vowel = _SIMPLE_VOWEL
     out_words = []
     for w in tokens:
         lw = w.lower()
         # 규칙 치환
-        for a, b in repl:
-            lw = re.sub(a, b, lw)
+        for pat, b in _SIMPLE_REPL:
+            lw = pat.sub(b, lw)
         # 간단 조합: 모음/자음 순차 치환
         syll = []
         i = 0
@@ -178,7 +204,7 @@ def eng_to_hangul_simple(name: str) -> str:
             if ch in vowel:
                 syll.append(vowel[ch])
             elif ch.isalpha():
-                syll.append(cons.get(ch, ch))
+                syll.append(_SIMPLE_CONS.get(ch, ch))
             else:
                 syll.append(ch)
             i += 1
@@ -220,13 +246,12 @@ def parse_messier_row(row: Dict[str, Any]) -> Dict[str, Any]:
             name_en = mid
 
     # name_kr: 필드 우선 -> KO_MAP -> 발음 변환
-    name_kr = name_kr_field or KO_MAP.get(name_en) or eng_to_hangul(name_en)
+    name_kr = name_kr_field or ko_for(name_en)
 
     ra_str, dec_str = None, None
     if coords:
-        c = coords.replace("LD.", "Dec").replace("ld.", "Dec")
-        c = c.replace("–", "-").replace("−", "-").replace("º", "°")
-        ra_match = RA_RE.search(c)
+        # norm_str가 대시/도 기호를 이미 정리했고 DEC_RE가 "LD."도 받으므로 추가 치환 불필요
+        ra_match = RA_RE.search(coords)
         if ra_match:
             hh = int(ra_match.group(1))
             mm = float(ra_match.group(2))
@@ -234,7 +259,7 @@ def parse_messier_row(row: Dict[str, Any]) -> Dict[str, Any]:
             mm_i = int(mm)
             ss += (mm - mm_i) * 60.0
             ra_str = hms_to_str(hh, mm_i, ss)
-        dec_match = DEC_RE.search(c)
+        dec_match = DEC_RE.search(coords)
         if dec_match:
             sgn = -1 if (dec_match.group(1) or "").startswith("-") else 1
             dd = int(dec_match.group(2))
@@ -268,7 +293,7 @@ def normalize_messier_simple(list_data: Iterable[Dict[str, Any]]) -> List[Dict[s
                 "id": mid,
                 "catalog": "Messier",
                 "name_en": name_en,
-                "name_kr": norm_str(row.get("name_kr")) or KO_MAP.get(name_en) or eng_to_hangul(name_en),
+                "name_kr": norm_str(row.get("name_kr")) or ko_for(name_en),
                 "ra": None,
                 "dec": None,
                 "magnitude": float_or_none(row.get("magnitude")),
@@ -308,14 +333,19 @@ def pick_common_name(names_alt: List[str]) -> Optional[str]:
 def extract_common_names(names_alt: list[str]) -> list[str]:
     """namesAlt에서 NAME … 형식의 모든 공용 명칭을 추출 (중복/공백 정리)."""
     out = []
+    seen = set()
     for item in names_alt or []:
         t = str(item).strip()
-        if t.upper().startswith("NAME "):
+        if t[:5].upper() == "NAME ":
             name = t[5:].strip()
-            if name and name not in out:
+            if name and name not in seen:
+                seen.add(name)
                 out.append(name)
     return out
     
+# 일반어 포함 여부(" star", " nebula", ... 부분 문자열, 대소문자 무시)를 한 번의 검색으로 판정
+_GENERIC_NAME_RE = re.compile(r" (?:star|nebula|cluster|galaxy|variable)| a | b ", re.IGNORECASE | re.ASCII)
+
 def choose_primary_en(common_names: list[str], fallbacks: list[str]) -> str:
     """
     대표 영어 이름 선택:
@@ -331,8 +361,7 @@ def choose_primary_en(common_names: list[str], fallbacks: list[str]) -> str:
             return n
     # 2) 일반어(덜 고유한) 패턴 점수화
     def score(n: str) -> tuple:
-        low = n.lower()
-        generic = any(w in low for w in [" star", " nebula", " cluster", " galaxy", " variable", " a ", " b "])
+        generic = _GENERIC_NAME_RE.search(n) is not None
         words = len(n.split())
         return (generic, words, len(n))  # generic=False(0)가 더 우선, 단어 수/길이 적을수록 우선
     if cand:
@@ -356,24 +385,24 @@ def normalize_bsc5p_known_schema(
         if mag_threshold is not None and magnitude is not None and magnitude > mag_threshold:
             continue
 
-        # 후보 ID들
-        bayer = norm_str(s.get("bayerAndOrFlamsteed"))
-        hd = norm_str(s.get("hdId"))
-        sao = norm_str(s.get("saoId"))
-        sid = first(
-            bayer,
-            (f"HD {hd}" if hd else None),
-            (f"SAO {sao}" if sao else None),
-            norm_str(s.get("dmId")),
-            norm_str(s.get("adsId")),
-        ) or f"line:{s.get('lineNumber','?')}"
-
-        # namesAlt 처리
+        # namesAlt 처리 (공용명 필터는 ID/이름 정규화 전에 먼저 적용)
         names_alt = s.get("namesAlt") or []
         common_list = extract_common_names(names_alt)  # ["Dog Star", "Sirius", "Sirius A", ...]
         if commonnames_only and not common_list:
             continue
 
+        # 후보 ID들
+        bayer = norm_str(s.get("bayerAndOrFlamsteed"))
+        hd = norm_str(s.get("hdId"))
+        sao = norm_str(s.get("saoId"))
+        # norm_str는 None 또는 비어 있지 않은 문자열만 돌려주므로 or로 첫 유효값 선택(단락 평가)
+        sid = (bayer
+               or (f"HD {hd}" if hd else None)
+               or (f"SAO {sao}" if sao else None)
+               or norm_str(s.get("dmId"))
+               or norm_str(s.get("adsId"))
+               or f"line:{s.get('lineNumber','?')}")
+
         # 대표 영어 이름 고르기
         primary_en = choose_primary_en(
             common_list,
@@ -391,8 +420,9 @@ def normalize_bsc5p_known_schema(
                 seen.add(n)
 
         # 한글: KO_MAP 우선, 없으면 발음 변환. aliases_kr도 병기
-        name_kr = KO_MAP.get(primary_en) or eng_to_hangul(primary_en)
-        aliases_kr = [KO_MAP.get(n) or eng_to_hangul(n) for n in aliases_en]
+        # (aliases_en[0]이 대표 이름이므로 aliases_kr[0]이 곧 name_kr)
+        aliases_kr = [ko_for(n) for n in aliases_en]
+        name_kr = aliases_kr[0]
 
         # 좌표
         ra_str = bsc5p_build_hms(s)
@@ -433,6 +463,22 @@ def build_solar_bodies() -> List[Dict[str, Any]]:
         })
     return out
 
+# ---------------- 입출력 ----------------
+def load_json(path: str) -> Any:
+    """JSON 파일 로드. orjson이 있으면 사용하고, 없으면 표준 json으로 대체."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with Path(path).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+def dump_json(obj: Any, path: str) -> None:
+    """JSON 파일 저장(UTF-8, 들여쓰기 2). orjson이 있으면 사용하며 출력은 표준 json과 동일."""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
 # ---------------- 메인 ----------------
 def main():
     ap = argparse.ArgumentParser(description="simpleMessier + bsc5p_extra(namesAlt 지원) → 한/영 병기 통합 카탈로그")
@@ -442,16 +488,16 @@ def main():
     ap.add_argument("--bsc5p-mag", default="6.5", help="BSC5P 임계 등급(이하만 포함). 'none'이면 비활성")
     ap.add_argument("--bsc5p-commonnames-only", action="store_true",
                     help="namesAlt에 'NAME ' 공용명이 있는 별만 포함")
+    ap.add_argument("--numeric-coords", action="store_true",
+                    help="ra/dec 문자열과 함께 도 단위 숫자 ra_deg/dec_deg도 출력")
     args = ap.parse_args()
 
     # 등급 임계값 파싱
     mag_thr = None if str(args.bsc5p_mag).lower() == "none" else float_or_none(args.bsc5p_mag)
 
     # 입력 로드
-    with Path(args.messier).open("r", encoding="utf-8") as f:
-        messier_raw = json.load(f)
-    with Path(args.bsc5p).open("r", encoding="utf-8") as f:
-        bsc5p_raw = json.load(f)
+    messier_raw = load_json(args.messier)
+    bsc5p_raw = load_json(args.bsc5p)
 
     messier_iter = messier_raw if isinstance(messier_raw, list) else messier_raw.get("data", [])
     bsc5p_iter = bsc5p_raw if isinstance(bsc5p_raw, list) else bsc5p_raw.get("data", [])
@@ -460,20 +506,19 @@ def main():
     bright  = normalize_bsc5p_known_schema(bsc5p_iter, mag_thr, args.bsc5p_commonnames_only)
     solar   = build_solar_bodies()
 
-    # 병합(id 기준)
-    def fill_missing(base: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
-        merged = base.copy()
-        for k, v in patch.items():
-            if merged.get(k) in (None, "") and v not in (None, ""):
-                merged[k] = v
-        return merged
-
+    # 병합(id 기준): 먼저 나온 항목의 빈 필드만 뒤 항목 값으로 채움 (제자리 갱신, 복사 없음)
     by_id: Dict[str, Dict[str, Any]] = {}
-    for item in messier + bright + solar:
+    for item in chain(messier, bright, solar):
         i = item.get("id")
         if not i:
             continue
-        by_id[i] = fill_missing(by_id[i], item) if i in by_id else item
+        existing = by_id.get(i)
+        if existing is None:
+            by_id[i] = item
+            continue
+        for k, v in item.items():
+            if existing.get(k) in (None, "") and v not in (None, ""):
+                existing[k] = v
 
     out = list(by_id.values())
 
@@ -487,8 +532,14 @@ def main():
 
     out.sort(key=sort_key)
 
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
+    # 선택: 소비 측에서 좌표를 다시 파싱하지 않도록 도 단위 숫자 좌표 병기
+    if args.numeric_coords:
+        for o in out:
+            if o.get("ra") and o.get("dec"):
+                o["ra_deg"] = hms_str_to_deg(o["ra"])
+                o["dec_deg"] = dms_str_to_deg(o["dec"])
+
+    dump_json(out, args.out)
 
     print(f"✔ Done. Wrote {len(out)} objects → {args.out}")
 